@@ -2,19 +2,86 @@
 
 from __future__ import annotations
 
+import asyncio
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_NAME, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
-from .const import DOMAIN
+from homeassistant.const import CONF_HOST, CONF_NAME, EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
+from .const import (
+    ATTR_DURATION,
+    ATTR_MODE,
+    DOMAIN,
+    PROFILE_MODE_DETERMINISTIC,
+    PROFILE_MODE_SAMPLING,
+    SCENE_LEVELS_STORAGE_KEY,
+    SERVICE_PROFILE,
+    STORAGE_VERSION,
+)
 from .hub_client import HubClient
 from .model import RakoDomainEntryData
+from .profiler import async_profile_deterministic, async_profile_sampling
 
 PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SELECT, Platform.COVER]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=30): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_MODE, default=PROFILE_MODE_SAMPLING): vol.In(
+            [PROFILE_MODE_SAMPLING, PROFILE_MODE_DETERMINISTIC]
+        ),
+    }
+)
+
 type RakoConfigEntry = ConfigEntry[RakoDomainEntryData]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Rako services."""
+    profile_lock = asyncio.Lock()
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the integration for a duration and write the report to the config directory."""
+        if profile_lock.locked():
+            raise HomeAssistantError("A Rako profile is already running")
+
+        async with profile_lock:
+            timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+            path = hass.config.path(f"rako_profile_{timestamp}")
+            if call.data[ATTR_MODE] == PROFILE_MODE_DETERMINISTIC:
+                files = await async_profile_deterministic(hass, call.data[ATTR_DURATION], path)
+            else:
+                files = await async_profile_sampling(hass, call.data[ATTR_DURATION], path)
+
+        return {"files": files}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: RakoConfigEntry) -> bool:
     """Set up Rako from a config entry."""
     hub_client = HubClient(
@@ -25,6 +92,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: RakoConfigEntry) -> bool
     )
 
     hub_info = await hub_client.get_hub_status()
+    await hub_client.async_load_scene_levels()
 
     device_registry = dr.async_get(hass)
     device_registry.async_get_or_create(
@@ -44,9 +112,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: RakoConfigEntry) -> bool
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    await hub_client.async_start()
+
+    async def async_stop_hub_client(event: Event) -> None:
+        """Stop the hub client when Home Assistant stops."""
+        await hub_client.async_stop()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_hub_client)
+    )
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: RakoConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        await entry.runtime_data["hub_client"].async_stop()
+
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: RakoConfigEntry) -> None:
+    """Remove the learned scene levels of a removed config entry."""
+    store: Store = Store(hass, STORAGE_VERSION, f"{SCENE_LEVELS_STORAGE_KEY}.{entry.entry_id}")
+    await store.async_remove()
@@ -10,10 +10,17 @@ import voluptuous as vol
 
 from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.selector import (
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
 from rakopy.hub import Hub
 from .const import DOMAIN, TIMEOUT
+from .discovery import async_discover_hubs, async_get_cached_hubs
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,6 +53,11 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovery_task: asyncio.Task[dict[str, str]] | None = None
+        self._discovered_hubs: dict[str, str] = {}
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -64,8 +76,105 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
             else:
                 return self.async_create_entry(title=info["title"], data=user_input)
 
+            return self._async_show_user_form(errors)
+
+        # Only skip the scan if the cache has a Hub that can still be added
+        cached_hubs = async_get_cached_hubs(self.hass) or {}
+        configured_hubs = self._async_configured_hubs()
+        if any(host not in configured_hubs for host in cached_hubs):
+            self._discovered_hubs = cached_hubs
+            return self._async_show_user_form(errors)
+
+        return await self.async_step_discovery()
+
+    async def async_step_discovery(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Search the local network for Hubs while showing progress."""
+        if self._discovery_task is None:
+            configured_hosts = {
+                entry.data[CONF_HOST] for entry in self._async_current_entries(include_ignore=False)
+            }
+            self._discovery_task = self.hass.async_create_task(
+                async_discover_hubs(self.hass, configured_hosts)
+            )
+
+        if not self._discovery_task.done():
+            return self.async_show_progress(
+                step_id="discovery",
+                progress_action="discovery",
+                progress_task=self._discovery_task,
+            )
+
+        try:
+            self._discovered_hubs = self._discovery_task.result()
+        except Exception:
+            _LOGGER.exception("Unexpected exception")
+
+        return self.async_show_progress_done(next_step_id="discovery_done")
+
+    async def async_step_discovery_done(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show the Hubs found on the local network."""
+        return self._async_show_user_form({})
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop a running discovery when the flow is closed."""
+        if self._discovery_task is not None and not self._discovery_task.done():
+            self._discovery_task.cancel()
+
+    @callback
+    def _async_configured_hubs(self) -> dict[str, str]:
+        """Return the host and Hub id of the configured Hubs."""
+        return {
+            entry.data[CONF_HOST]: entry.unique_id.removeprefix("Rako_Hub_")
+            for entry in self._async_current_entries(include_ignore=False)
+            if entry.unique_id
+        }
+
+    @callback
+    def _async_show_user_form(self, errors: dict[str, str]) -> ConfigFlowResult:
+        """Show the user form, offering the discovered Hubs that are not configured yet."""
+        configured_hubs = self._async_configured_hubs()
+        description_placeholders = {
+            "configured_hubs": "".join(
+                f"\n- Rako Hub {hub_id} ({host})" for host, hub_id in configured_hubs.items()
+            )
+            or "\n- None"
+        }
+        options = [
+            SelectOptionDict(value=host, label=f"Rako Hub {hub_id} ({host})")
+            for host, hub_id in self._discovered_hubs.items()
+            if host not in configured_hubs
+        ]
+        if not options:
+            return self.async_show_form(
+                step_id="user",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors=errors,
+                description_placeholders=description_placeholders,
+            )
+
+        # Offer the discovered Hubs while still allowing a host to be typed in
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME): str,
+                vol.Required(CONF_HOST, default=options[0]["value"]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=options,
+                        custom_value=True,
+                        mode=SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+            }
+        )
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="user",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders=description_placeholders,
         )
 
 
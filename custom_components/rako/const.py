@@ -2,3 +2,27 @@
 
 DOMAIN = "rako"
 TIMEOUT = 3
+
+STORAGE_VERSION = 1
+SCENE_LEVELS_STORAGE_KEY = f"{DOMAIN}.scene_levels"
+SCENE_LEVELS_SAVE_DELAY = 10
+SCENE_QUIET_TIME = 2
+SCENE_SETTLE_MAX_TIME = 120
+
+FADE_TICK_INTERVAL = 0.25
+FADE_MAX_COMMANDS_PER_TICK = 8
+
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+ATTR_MODE = "mode"
+PROFILE_MODE_SAMPLING = "sampling"
+PROFILE_MODE_DETERMINISTIC = "deterministic"
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+DISCOVERY_CACHE = f"{DOMAIN}_discovered_hubs"
+DISCOVERY_PORT = 9761
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_HOST_TIMEOUT = 0.5
+DISCOVERY_LISTEN_TIME = 1
+DISCOVERY_CACHE_TIME = 300
+DISCOVERY_MIN_PREFIX = 24
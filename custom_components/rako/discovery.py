@@ -0,0 +1,148 @@
+"""Rako integration local network Hub discovery."""
+from __future__ import annotations
+
+import asyncio
+from ipaddress import IPv4Address, ip_network
+import logging
+from typing import Any
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+from rakopy.hub import Hub
+from .const import (
+    DISCOVERY_CACHE,
+    DISCOVERY_CACHE_TIME,
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_HOST_TIMEOUT,
+    DISCOVERY_LISTEN_TIME,
+    DISCOVERY_MIN_PREFIX,
+    DISCOVERY_PORT,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _AnnouncementProtocol(asyncio.DatagramProtocol):
+    """Collect the addresses of Hubs answering a discovery broadcast."""
+
+    def __init__(self) -> None:
+        """Initialize the protocol."""
+        self.hosts: set[str] = set()
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        """Broadcast a discovery request."""
+        transport.sendto(b"D", ("255.255.255.255", DISCOVERY_PORT))
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
+        """Record the sender of a Hub announcement."""
+        if data and data != b"D":
+            self.hosts.add(addr[0])
+
+
+async def _async_listen_for_announcements() -> set[str]:
+    """Listen for Hub announcements for a short time."""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            _AnnouncementProtocol,
+            local_addr=("0.0.0.0", DISCOVERY_PORT),
+            allow_broadcast=True,
+            reuse_port=True,
+        )
+    except (OSError, ValueError) as e:
+        _LOGGER.debug("Cannot listen for Rako Hub announcements: %s", repr(e))
+        return set()
+
+    try:
+        await asyncio.sleep(DISCOVERY_LISTEN_TIME)
+    finally:
+        transport.close()
+
+    return protocol.hosts
+
+
+async def _async_get_candidate_hosts(hass: HomeAssistant) -> set[str]:
+    """Return the addresses on the local IPv4 networks."""
+    hosts: set[str] = set()
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            address = IPv4Address(ipv4["address"])
+            if address.is_loopback or address.is_link_local:
+                continue
+            # Bound the scan to a /24 around our own address on larger networks
+            prefix = max(ipv4["network_prefix"], DISCOVERY_MIN_PREFIX)
+            subnet = ip_network(f"{address}/{prefix}", strict=False)
+            hosts.update(str(host) for host in subnet.hosts() if host != address)
+
+    return hosts
+
+
+async def _async_probe_host(semaphore: asyncio.Semaphore, host: str) -> str | None:
+    """Return the Hub id of a host, or None if it is not a Rako Hub."""
+    async with semaphore:
+        hub = Hub(DOMAIN, host)
+        try:
+            hub_info = await asyncio.wait_for(
+                hub.get_hub_status(), timeout=DISCOVERY_HOST_TIMEOUT
+            )
+        except Exception:
+            return None
+
+    return hub_info.id
+
+
+def async_get_cached_hubs(hass: HomeAssistant) -> dict[str, str] | None:
+    """Return the Hubs found by a recent discovery, or None if it found none.
+
+    An empty result is not reused, so a Hub plugged in after a scan that
+    found nothing is found by the next config flow.
+    """
+    cache: dict[str, Any] | None = hass.data.get(DISCOVERY_CACHE)
+    if (
+        cache is None
+        or not cache["hubs"]
+        or hass.loop.time() - cache["time"] >= DISCOVERY_CACHE_TIME
+    ):
+        return None
+
+    return cache["hubs"]
+
+
+async def async_discover_hubs(
+    hass: HomeAssistant, configured_hosts: set[str]
+) -> dict[str, str]:
+    """Discover Rako Hubs on the local network.
+
+    Returns a dict of host to Hub id and caches it. Configured hosts are
+    not probed.
+    """
+    semaphore = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
+    announcements = asyncio.create_task(_async_listen_for_announcements())
+
+    try:
+        candidate_hosts = list(await _async_get_candidate_hosts(hass) - configured_hosts)
+        results = await asyncio.gather(
+            *(_async_probe_host(semaphore, host) for host in candidate_hosts)
+        )
+        announced = await announcements
+    finally:
+        announcements.cancel()
+
+    hubs = {
+        host: hub_id for host, hub_id in zip(candidate_hosts, results) if hub_id is not None
+    }
+
+    # Hubs that announced themselves from outside the scanned subnets
+    announced_hosts = list(announced - set(candidate_hosts) - configured_hosts)
+    results = await asyncio.gather(
+        *(_async_probe_host(semaphore, host) for host in announced_hosts)
+    )
+    hubs.update(
+        (host, hub_id) for host, hub_id in zip(announced_hosts, results) if hub_id is not None
+    )
+
+    hass.data[DISCOVERY_CACHE] = {"time": hass.loop.time(), "hubs": hubs}
+    return hubs
@@ -2,15 +2,29 @@
 from asyncio import Task
 import asyncio
 import contextlib
+from datetime import datetime
+from functools import partial
 import logging
 
 from homeassistant.components.cover import CoverEntity
 from homeassistant.components.light import LightEntity
 from homeassistant.components.select import SelectEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from rakopy.errors import SendCommandError
 from rakopy.hub import Hub
 from rakopy.model import LevelChangedEvent, SceneChangedEvent
-from .model import RakoDomainEntryData
+from .const import (
+    FADE_MAX_COMMANDS_PER_TICK,
+    FADE_TICK_INTERVAL,
+    SCENE_LEVELS_SAVE_DELAY,
+    SCENE_LEVELS_STORAGE_KEY,
+    SCENE_QUIET_TIME,
+    SCENE_SETTLE_MAX_TIME,
+    STORAGE_VERSION,
+)
+from .model import ChannelFade, RakoDomainEntryData
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +49,20 @@ class HubClient(Hub):
         self._light_map: dict[str, LightEntity] = {}
         self._scene_map: dict[str, SelectEntity] = {}
 
+        # room_id -> scene_id -> channel_id -> level, learned from the hub
+        self._scene_levels: dict[int, dict[int, dict[int, int]]] = {}
+        # room_id -> (scene_id, time the scene was activated)
+        self._settling_scenes: dict[int, tuple[int, float]] = {}
+        # room_id -> timer taking the room's snapshot once it has gone quiet
+        self._settle_timers: dict[int, CALLBACK_TYPE] = {}
+        self._scene_levels_store: Store = Store(
+            hass, STORAGE_VERSION, f"{SCENE_LEVELS_STORAGE_KEY}.{entry_id}"
+        )
+
+        # (room_id, channel_id) -> fade, all stepped by a single task
+        self._fades: dict[tuple[int, int], ChannelFade] = {}
+        self._fade_task: Task | None = None
+
     @property
     def hub_id(self) -> str:
         """Return Hub Id."""
@@ -43,82 +71,298 @@ class HubClient(Hub):
 
         return rako_domain_entry_data['hub_id']
 
+    async def async_load_scene_levels(self) -> None:
+        """Load the learned scene levels from storage."""
+        data = await self._scene_levels_store.async_load()
+        if not data:
+            return
+
+        self._scene_levels = {
+            int(room_id): {
+                int(scene_id): {
+                    int(channel_id): level for channel_id, level in channel_levels.items()
+                }
+                for scene_id, channel_levels in scenes.items()
+            }
+            for room_id, scenes in data.items()
+        }
+
+    async def set_level(self, room_id: int, channel_id: int, level: int) -> None:
+        """Set a channel level. Stops learning levels for the room's active scene."""
+        self._stop_settling(room_id)
+        self._cancel_fades(room_id, channel_id)
+        await super().set_level(room_id, channel_id, level)
+
+    async def set_scene(self, room_id: int, channel_id: int, scene_id: int) -> None:
+        """Set a scene. Stops any fades the scene overrides."""
+        self._cancel_fades(room_id, channel_id)
+        await super().set_scene(room_id, channel_id, scene_id)
+
+    def _cancel_fades(self, room_id: int, channel_id: int) -> None:
+        """Stop the fades a command to a room channel overrides.
+
+        Channel 0 addresses the whole room, so it overrides and is overridden
+        by every channel in the room.
+        """
+        for fade_room_id, fade_channel_id in list(self._fades):
+            if fade_room_id == room_id and (
+                0 in (channel_id, fade_channel_id) or channel_id == fade_channel_id
+            ):
+                del self._fades[(fade_room_id, fade_channel_id)]
+
+    def _cancel_fade_for_level(self, room_id: int, channel_id: int, level: int) -> None:
+        """Stop a channel's fade if the hub reports a level the fade did not set."""
+        fade = self._fades.get((room_id, channel_id))
+        if fade is not None and not fade.is_on_path(level):
+            del self._fades[(room_id, channel_id)]
+
+    async def fade_level(
+        self,
+        room_id: int,
+        channel_id: int,
+        start_level: int,
+        target_level: int,
+        transition: float,
+    ) -> None:
+        """Fade a channel level over the transition time in seconds."""
+        self._stop_settling(room_id)
+        self._cancel_fades(room_id, channel_id)
+        now = self.hass.loop.time()
+        self._fades[(room_id, channel_id)] = ChannelFade(
+            start_level=start_level,
+            target_level=target_level,
+            start_time=now,
+            duration=transition,
+            sent_level=start_level,
+            sent_time=now,
+        )
+
+        if self._fade_task is None or self._fade_task.done():
+            self._fade_task = asyncio.create_task(
+                self._run_fades(), name=f"rako_{self.hub_id}_fade_task"
+            )
+
+    async def _run_fades(self) -> None:
+        """Step all fading channels, sending a bounded number of commands per tick."""
+        while self._fades:
+            await asyncio.sleep(FADE_TICK_INTERVAL)
+            await self._async_fade_tick(self.hass.loop.time())
+
+    async def _async_fade_tick(self, now: float) -> None:
+        """Send the fade steps due at a point in time."""
+        pending: list[tuple[tuple[int, int], ChannelFade, int]] = []
+        for key, fade in list(self._fades.items()):
+            level = fade.level_at(now)
+            if level != fade.sent_level:
+                pending.append((key, fade, level))
+            elif fade.is_finished(now):
+                del self._fades[key]
+
+        # Final levels go first so no fade is left short of its target,
+        # then the channels that have waited longest for a step.
+        pending.sort(key=lambda item: (not item[1].is_finished(now), item[1].sent_time))
+
+        for key, fade, level in pending[:FADE_MAX_COMMANDS_PER_TICK]:
+            if self._fades.get(key) is not fade:
+                continue
+            room_id, channel_id = key
+            try:
+                await super().set_level(room_id, channel_id, level)
+            except SendCommandError:
+                _LOGGER.error("An error occurred while fading Rako room %s channel %s", room_id, channel_id)
+                self._fades.pop(key, None)
+                continue
+            except Exception as e:
+                # Keep the shared task alive for every other fading channel
+                _LOGGER.exception("Unexpected exception: %s", repr(e))
+                self._fades.pop(key, None)
+                continue
+
+            fade.sent_level = level
+            fade.sent_time = now
+            if level == fade.target_level and self._fades.get(key) is fade:
+                del self._fades[key]
+
+    def apply_scene_levels(self, room_id: int, scene_id: int) -> None:
+        """Update every entity affected by a scene with its learned levels."""
+        # Already applied, e.g. by the select entity before the hub's event arrived
+        if (settling_scene := self._settling_scenes.get(room_id)) and settling_scene[0] == scene_id:
+            return
+
+        self._stop_settling(room_id)
+        self._settling_scenes[room_id] = (scene_id, self.hass.loop.time())
+        self._schedule_scene_snapshot(room_id)
+
+        channel_levels = self._scene_levels.get(room_id, {}).get(scene_id)
+        if not channel_levels:
+            return
+
+        for channel_id, level in channel_levels.items():
+            self._update_channel_level(room_id, channel_id, level)
+
+    def _schedule_scene_snapshot(self, room_id: int) -> None:
+        """(Re)start the quiet period after which a settling room is snapshotted."""
+        if room_id not in self._settling_scenes:
+            return
+
+        if cancel_timer := self._settle_timers.pop(room_id, None):
+            cancel_timer()
+        self._settle_timers[room_id] = async_call_later(
+            self.hass,
+            SCENE_QUIET_TIME,
+            HassJob(partial(self._async_snapshot_scene_levels, room_id)),
+        )
+
+    def _stop_settling(self, room_id: int) -> None:
+        """Stop learning levels for the room's active scene."""
+        self._settling_scenes.pop(room_id, None)
+        if cancel_timer := self._settle_timers.pop(room_id, None):
+            cancel_timer()
+
+    async def _async_snapshot_scene_levels(self, room_id: int, _now: datetime) -> None:
+        """Record the room's levels as its scene's levels once the scene has settled."""
+        self._settle_timers.pop(room_id, None)
+        if (settling_scene := self._settling_scenes.get(room_id)) is None:
+            return
+        scene_id, activated_at = settling_scene
+
+        try:
+            levels = await self.get_levels()
+        except Exception as e:
+            _LOGGER.debug("Cannot read levels for room %s: %s", room_id, repr(e))
+            self._stop_settling(room_id)
+            return
+
+        # The room changed while the levels were being read
+        if self._settling_scenes.get(room_id) != settling_scene:
+            return
+
+        room_level = next((level for level in levels if level.room_id == room_id), None)
+        if room_level is None or room_level.current_scene_id != scene_id:
+            self._stop_settling(room_id)
+            return
+
+        # Wait for channels that are still fading towards the scene's levels
+        if any(
+            channel_level.target_level is not None
+            and channel_level.target_level != channel_level.current_level
+            for channel_level in room_level.channel_levels
+        ):
+            if self.hass.loop.time() - activated_at < SCENE_SETTLE_MAX_TIME:
+                self._schedule_scene_snapshot(room_id)
+            else:
+                self._stop_settling(room_id)
+            return
+
+        self._stop_settling(room_id)
+        snapshot = {
+            channel_level.channel_id: channel_level.current_level
+            for channel_level in room_level.channel_levels
+        }
+        scenes = self._scene_levels.setdefault(room_id, {})
+        if scenes.get(scene_id) != snapshot:
+            scenes[scene_id] = snapshot
+            self._scene_levels_store.async_delay_save(
+                self._scene_levels_to_store, SCENE_LEVELS_SAVE_DELAY
+            )
+
+    def _scene_levels_to_store(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Return the learned scene levels in a JSON serialisable form."""
+        return {
+            str(room_id): {
+                str(scene_id): {
+                    str(channel_id): level for channel_id, level in channel_levels.items()
+                }
+                for scene_id, channel_levels in scenes.items()
+            }
+            for room_id, scenes in self._scene_levels.items()
+        }
+
+    def _update_channel_level(self, room_id: int, channel_id: int, level: int) -> None:
+        """Update the cover or light entity of a channel with a new level."""
+        unique_id = f"{self.hub_id}_{room_id}_{channel_id}"
+
+        # Handle cover entities (blinds use level for position)
+        if unique_id in self._cover_map:
+            self._cover_map[unique_id].current_cover_position = level
+
+        # Handle light entities
+        if unique_id in self._light_map:
+            self._light_map[unique_id].brightness = level
+
+    async def async_start(self) -> None:
+        """Start listening for hub events."""
+        if self._event_listener_task is None or self._event_listener_task.done():
+            self._event_listener_task = asyncio.create_task(
+                subscribe_to_events(self), name=f"rako_{self.hub_id}_event_listener_task"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop all background tasks and close the hub event connection."""
+        self._fades.clear()
+        for task in (self._event_listener_task, self._fade_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._event_listener_task = None
+        self._fade_task = None
+
+        for room_id in list(self._settling_scenes):
+            self._stop_settling(room_id)
+        if self._scene_levels:
+            await self._scene_levels_store.async_save(self._scene_levels_to_store())
+
     async def add_cover(self, cover: CoverEntity) -> None:
         """Register a cover to listen for state updates."""
         self._cover_map[cover.unique_id] = cover
-        self._try_start_event_listener_task()
 
     async def add_light(self, light: LightEntity) -> None:
         """Register a light to listen for state updates."""
         self._light_map[light.unique_id] = light
-        self._try_start_event_listener_task()
 
     async def add_scene(self, select: SelectEntity) -> None:
         """Register a select to listen for state updates."""
         self._scene_map[select.unique_id] = select
-        self._try_start_event_listener_task()
 
     async def remove_cover(self, cover: CoverEntity) -> None:
         """Deregister a cover to listen for state updates."""
-        if cover.unique_id in self._cover_map:
-            del self._cover_map[cover.unique_id]
-            self._try_cancel_event_listener_task()
+        self._cover_map.pop(cover.unique_id, None)
 
     async def remove_light(self, light: LightEntity) -> None:
         """Deregister a light to listen for state updates."""
-        if light.unique_id in self._light_map:
-            del self._light_map[light.unique_id]
-            self._try_cancel_event_listener_task()
+        self._light_map.pop(light.unique_id, None)
 
     async def remove_scene(self, select: SelectEntity) -> None:
         """Deregister a select to listen for state updates."""
-        if select.unique_id in self._scene_map:
-            del self._scene_map[select.unique_id]
-            self._try_cancel_event_listener_task()
-
-    def _try_start_event_listener_task(self) -> None:
-        """Start the event listener task."""
-        total_entities = len(self._light_map) + len(self._scene_map) + len(self._cover_map)
-        if total_entities == 1:
-            self._event_listener_task: Task = asyncio.create_task(
-                subscribe_to_events(self), name=f"rako_{self.hub_id}_event_listener_task"
-            )
-
-    async def _try_cancel_event_listener_task(self) -> None:
-        """Try to cancel event listener task."""
-        total_entities = len(self._light_map) + len(self._scene_map) + len(self._cover_map)
-        if total_entities == 0:
-            if event_listener_task := self._event_listener_task:
-                event_listener_task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await event_listener_task
+        self._scene_map.pop(select.unique_id, None)
 
 
 async def subscribe_to_events(hub_client: HubClient) -> None:
     """Subscribe to events method."""
-    async for event in hub_client.get_events():
-        try:
-            if event and isinstance(event, LevelChangedEvent):
-                unique_id = f"{hub_client.hub_id}_{event.room_id}_{event.channel_id}"
-
-                # Handle cover entities (blinds use level for position)
-                if unique_id in hub_client._cover_map:
+    # Close the event stream deterministically when the task is cancelled.
+    async with contextlib.aclosing(hub_client.get_events()) as events:
+        async for event in events:
+            try:
+                if event and isinstance(event, LevelChangedEvent):
                     if event.target_level is not None:
-                        hub_client._cover_map[unique_id].current_cover_position = event.target_level
+                        level = event.target_level
                     else:
-                        hub_client._cover_map[unique_id].current_cover_position = event.current_level
+                        level = event.current_level
 
-                # Handle light entities
-                if unique_id in hub_client._light_map:
-                    if event.target_level is not None:
-                        hub_client._light_map[unique_id].brightness = event.target_level
-                    else:
-                        hub_client._light_map[unique_id].brightness = event.current_level
+                    # A keypad or another controller changed the level mid fade
+                    hub_client._cancel_fade_for_level(event.room_id, event.channel_id, level)
+                    hub_client._schedule_scene_snapshot(event.room_id)
+                    hub_client._update_channel_level(event.room_id, event.channel_id, level)
 
-            elif event and isinstance(event, SceneChangedEvent):
-                unique_id = f"{hub_client.hub_id}_{event.room_id}"
-                if unique_id in hub_client._scene_map:
-                    hub_client._scene_map[unique_id].current_option = event.active_scene_id
+                elif event and isinstance(event, SceneChangedEvent):
+                    unique_id = f"{hub_client.hub_id}_{event.room_id}"
+                    if unique_id in hub_client._scene_map:
+                        hub_client._scene_map[unique_id].current_option = event.active_scene_id
 
-        except Exception as e:
-            _LOGGER.exception("Unexpected exception: %s", repr(e))
+                    # A scene set on the hub, e.g. from a keypad, overrides the room's fades
+                    hub_client._cancel_fades(event.room_id, 0)
+                    hub_client.apply_scene_levels(event.room_id, event.active_scene_id)
+
+            except Exception as e:
+                _LOGGER.exception("Unexpected exception: %s", repr(e))
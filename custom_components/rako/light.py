@@ -6,8 +6,10 @@ from typing import Any
 
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
     ColorMode,
     LightEntity,
+    LightEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -97,6 +99,7 @@ class RakoLightEntity(LightEntity):
         if not channel or not channel.color_type:
             self.supported_color_modes = {ColorMode.BRIGHTNESS}
             self.color_mode = ColorMode.BRIGHTNESS
+        self._attr_supported_features = LightEntityFeature.TRANSITION
 
     @property
     def brightness(self) -> int:
@@ -143,19 +146,23 @@ class RakoLightEntity(LightEntity):
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
-        if not self._channel:
+        if not self._channel and not kwargs.get(ATTR_TRANSITION):
             await self._hub_client.set_scene(self._room.id, 0, 0)
         else:
-            await self.async_turn_on(brightness=0)
+            await self.async_turn_on(**{**kwargs, ATTR_BRIGHTNESS: 0})
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the light."""
         brightness = kwargs.get(ATTR_BRIGHTNESS, 255)
+        transition = kwargs.get(ATTR_TRANSITION)
+        channel_id = self._channel.id if self._channel else 0
         try:
-            if self._channel:
-                await self._hub_client.set_level(self._room.id, self._channel.id, brightness)
+            if transition:
+                await self._hub_client.fade_level(
+                    self._room.id, channel_id, self.brightness, brightness, transition
+                )
             else:
-                await self._hub_client.set_level(self._room.id, 0, brightness)
+                await self._hub_client.set_level(self._room.id, channel_id, brightness)
             self.brightness = brightness
 
         except (SendCommandError):
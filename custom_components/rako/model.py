@@ -1,6 +1,7 @@
 """Rako integration shared models."""
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, TypedDict
 
 if TYPE_CHECKING:
@@ -12,3 +13,31 @@ class RakoDomainEntryData(TypedDict):
 
     hub_id: str
     hub_client: HubClient
+
+
+@dataclass
+class ChannelFade:
+    """A channel level fade stepped by the Hub client."""
+
+    start_level: int
+    target_level: int
+    start_time: float
+    duration: float
+    sent_level: int
+    sent_time: float
+
+    def is_finished(self, now: float) -> bool:
+        """Return true if the fade should have reached its target level."""
+        return now - self.start_time >= self.duration
+
+    def level_at(self, now: float) -> int:
+        """Return the level the channel should be at."""
+        if self.is_finished(now):
+            return self.target_level
+        progress = (now - self.start_time) / self.duration
+        return round(self.start_level + (self.target_level - self.start_level) * progress)
+
+    def is_on_path(self, level: int) -> bool:
+        """Return true if a reported level belongs to this fade's steps so far."""
+        low, high = sorted((self.start_level, self.sent_level))
+        return low <= level <= high or level == self.target_level
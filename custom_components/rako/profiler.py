@@ -0,0 +1,143 @@
+"""Rako integration on-demand profiler."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from types import FrameType
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from .const import PROFILE_SAMPLE_INTERVAL
+
+# Frames from this integration or the rakopy library are in scope
+_INTEGRATION_PATH = os.path.dirname(__file__)
+_RAKOPY_MARKER = f"{os.sep}rakopy{os.sep}"
+
+
+def _is_in_scope(filename: str) -> bool:
+    """Return true if the file belongs to the integration or rakopy."""
+    return filename.startswith(_INTEGRATION_PATH) or _RAKOPY_MARKER in filename
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Return a collapsed-stack friendly label for a frame."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample the event loop thread's stack from a worker thread."""
+
+    def __init__(self, thread_id: int) -> None:
+        """Initialize the sampler for a thread."""
+        self._thread_id = thread_id
+        self._stop = threading.Event()
+        self.stacks: Counter[str] = Counter()
+
+    def run(self, duration: float) -> None:
+        """Take samples until the duration has elapsed or stop is called."""
+        timer = threading.Timer(duration, self._stop.set)
+        timer.start()
+        try:
+            while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+                self._sample()
+        finally:
+            timer.cancel()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+
+    def _sample(self) -> None:
+        """Record the current stack if it passes through the integration."""
+        frame = sys._current_frames().get(self._thread_id)
+        labels: list[str] = []
+        in_scope = False
+        while frame is not None:
+            in_scope = in_scope or _is_in_scope(frame.f_code.co_filename)
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+
+        if in_scope:
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        """Write the samples in collapsed-stack format for flame graph tools."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+async def async_profile_sampling(hass: HomeAssistant, duration: float, path: str) -> list[str]:
+    """Sample the event loop for the duration and write a collapsed-stack report."""
+    loop = asyncio.get_running_loop()
+    sampler = StackSampler(threading.get_ident())
+    finished = loop.create_future()
+
+    def set_finished() -> None:
+        """Mark the sampler as done, unless the service call was cancelled."""
+        if not finished.done():
+            finished.set_result(None)
+
+    def run_sampler() -> None:
+        """Run the sampler and wake the event loop when it is done."""
+        try:
+            sampler.run(duration)
+        finally:
+            loop.call_soon_threadsafe(set_finished)
+
+    # A dedicated thread, so a long profile does not hold an executor worker
+    threading.Thread(target=run_sampler, name="rako_profile_sampler", daemon=True).start()
+    try:
+        await finished
+    finally:
+        sampler.stop()
+
+    collapsed_path = f"{path}.collapsed"
+    await hass.async_add_executor_job(sampler.write_collapsed, collapsed_path)
+    return [collapsed_path]
+
+
+async def async_profile_deterministic(hass: HomeAssistant, duration: float, path: str) -> list[str]:
+    """Profile the event loop for the duration and write pstats reports."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:
+        raise HomeAssistantError(f"Cannot start profiling: {e}") from e
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        profile.disable()
+
+    pstats_path = f"{path}.pstats"
+    report_path = f"{path}.txt"
+    await hass.async_add_executor_job(_write_pstats, profile, pstats_path, report_path)
+    return [pstats_path, report_path]
+
+
+def _write_pstats(profile: cProfile.Profile, pstats_path: str, report_path: str) -> None:
+    """Dump stats and a text report restricted to integration functions."""
+    with open(report_path, "w", encoding="utf-8") as file:
+        stats = pstats.Stats(profile, stream=file)
+
+        # The whole event loop was profiled, keep only integration and rakopy functions
+        stats.stats = {
+            func: (cc, nc, tt, ct, {
+                caller: timing for caller, timing in callers.items() if _is_in_scope(caller[0])
+            })
+            for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+            if _is_in_scope(func[0])
+        }
+        stats.total_calls = sum(nc for _, nc, _, _, _ in stats.stats.values())
+        stats.prim_calls = sum(cc for cc, _, _, _, _ in stats.stats.values())
+        stats.total_tt = sum(tt for _, _, tt, _, _ in stats.stats.values())
+
+        stats.dump_stats(pstats_path)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats()
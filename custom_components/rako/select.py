@@ -113,4 +113,7 @@ class RakoSceneEntity(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        await self._hub_client.set_scene(self._room.id, 0, self._reverse_lookup[option])
+        scene_id = self._reverse_lookup[option]
+        await self._hub_client.set_scene(self._room.id, 0, scene_id)
+        self.current_option = scene_id
+        self._hub_client.apply_scene_levels(self._room.id, scene_id)
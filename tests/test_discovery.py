@@ -0,0 +1,175 @@
+"""Tests for the Rako Hub discovery."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant import config_entries
+from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from custom_components.rako.const import DISCOVERY_CONCURRENCY, DOMAIN
+from custom_components.rako.discovery import async_discover_hubs, async_get_cached_hubs
+
+ADAPTERS = [
+    {
+        "name": "eth0",
+        "enabled": True,
+        "ipv4": [{"address": "192.168.1.10", "network_prefix": 24}],
+        "ipv6": [],
+    },
+    {
+        "name": "eth1",
+        "enabled": False,
+        "ipv4": [{"address": "10.1.1.10", "network_prefix": 24}],
+        "ipv6": [],
+    },
+]
+
+
+class FakeHubs:
+    """Fake rakopy Hubs answering for some hosts and hanging for the others."""
+
+    def __init__(self, hub_ids: dict[str, str]) -> None:
+        """Initialize the fake network."""
+        self.hub_ids = hub_ids
+        self.probed: set[str] = set()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, name: str, host: str) -> SimpleNamespace:
+        """Create a fake Hub for a host."""
+        return SimpleNamespace(get_hub_status=lambda: self.get_hub_status(host))
+
+    async def get_hub_status(self, host: str) -> SimpleNamespace:
+        """Return the status of a Hub, or hang if the host is not a Hub."""
+        self.probed.add(host)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if host not in self.hub_ids:
+                await asyncio.sleep(3600)
+            await asyncio.sleep(0)
+            return SimpleNamespace(id=self.hub_ids[host])
+        finally:
+            self.running -= 1
+
+
+def _patch_network(fake_hubs: FakeHubs, announced_hosts: set[str]):
+    """Patch the network adapters, Hub announcements and Hub client."""
+    async def listen_for_announcements() -> set[str]:
+        return announced_hosts
+
+    return (
+        patch(
+            "custom_components.rako.discovery.network.async_get_adapters",
+            return_value=ADAPTERS,
+        ),
+        patch(
+            "custom_components.rako.discovery._async_listen_for_announcements",
+            listen_for_announcements,
+        ),
+        patch("custom_components.rako.discovery.Hub", fake_hubs),
+        patch("custom_components.rako.discovery.DISCOVERY_HOST_TIMEOUT", 0.01),
+    )
+
+
+async def test_discover_hubs(hass: HomeAssistant) -> None:
+    """Test Hubs are found on the subnet and from announcements, within the concurrency bound."""
+    fake_hubs = FakeHubs(
+        {
+            "192.168.1.20": "hub20",
+            "192.168.1.30": "hub30",
+            "192.168.1.40": "hub40",
+            "10.0.0.5": "hub5",
+        }
+    )
+    network_patch, listen_patch, hub_patch, timeout_patch = _patch_network(
+        fake_hubs, {"10.0.0.5", "192.168.1.20"}
+    )
+    with network_patch, listen_patch, hub_patch, timeout_patch:
+        hubs = await async_discover_hubs(hass, {"192.168.1.40"})
+
+    assert hubs == {
+        "192.168.1.20": "hub20",
+        "192.168.1.30": "hub30",
+        "10.0.0.5": "hub5",
+    }
+    # Our own address, configured hosts and disabled adapters are not probed
+    assert len(fake_hubs.probed) == 252 + 1
+    assert "192.168.1.10" not in fake_hubs.probed
+    assert "192.168.1.40" not in fake_hubs.probed
+    assert not any(host.startswith("10.1.1.") for host in fake_hubs.probed)
+    assert fake_hubs.max_running == DISCOVERY_CONCURRENCY
+    assert async_get_cached_hubs(hass) == hubs
+
+
+async def test_discover_no_hubs_is_not_reused(hass: HomeAssistant) -> None:
+    """Test a scan without Hubs is not reused, so a new flow scans again."""
+    assert async_get_cached_hubs(hass) is None
+
+    fake_hubs = FakeHubs({})
+    network_patch, listen_patch, hub_patch, timeout_patch = _patch_network(fake_hubs, set())
+    with network_patch, listen_patch, hub_patch, timeout_patch:
+        assert await async_discover_hubs(hass, set()) == {}
+
+    assert async_get_cached_hubs(hass) is None
+
+
+def _add_configured_hub(hass: HomeAssistant) -> None:
+    """Add a config entry for the Hub at 192.168.1.40."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="Rako_Hub_hub40",
+        data={CONF_NAME: "test", CONF_HOST: "192.168.1.40"},
+    ).add_to_hass(hass)
+
+
+async def test_user_form_offers_cached_hubs(hass: HomeAssistant) -> None:
+    """Test cached Hubs are offered without scanning and configured Hubs are only listed."""
+    _add_configured_hub(hass)
+
+    with (
+        patch(
+            "custom_components.rako.config_flow.async_get_cached_hubs",
+            return_value={"192.168.1.20": "hub20", "192.168.1.40": "hub40"},
+        ),
+        patch("custom_components.rako.config_flow.async_discover_hubs") as mock_discover,
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "user"
+    mock_discover.assert_not_called()
+    assert "Rako Hub hub40 (192.168.1.40)" in result["description_placeholders"]["configured_hubs"]
+
+    host_key, host_selector = next(
+        (key, value) for key, value in result["data_schema"].schema.items() if key == CONF_HOST
+    )
+    assert host_key.default() == "192.168.1.20"
+    assert [option["value"] for option in host_selector.config["options"]] == ["192.168.1.20"]
+
+
+async def test_user_form_scans_when_cache_has_only_configured_hubs(hass: HomeAssistant) -> None:
+    """Test a cache holding only configured Hubs does not skip the scan."""
+    _add_configured_hub(hass)
+
+    with (
+        patch(
+            "custom_components.rako.config_flow.async_get_cached_hubs",
+            return_value={"192.168.1.40": "hub40"},
+        ),
+        patch(
+            "custom_components.rako.config_flow.async_discover_hubs", return_value={}
+        ) as mock_discover,
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        await hass.async_block_till_done()
+
+    mock_discover.assert_called_once()
+    assert result["step_id"] == "discovery"
@@ -0,0 +1,141 @@
+"""Tests for the Rako Hub client fade engine."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+from rakopy.hub import Hub
+from custom_components.rako.const import DOMAIN, FADE_MAX_COMMANDS_PER_TICK
+from custom_components.rako.hub_client import HubClient
+
+
+class FakeSetLevel:
+    """Record level commands, failing for some channels."""
+
+    def __init__(self) -> None:
+        """Initialize the fake."""
+        self.commands: list[tuple[int, int, int]] = []
+        self.failing_channels: set[int] = set()
+
+    async def __call__(self, hub: Hub, room_id: int, channel_id: int, level: int) -> None:
+        """Record or fail a level command."""
+        if channel_id in self.failing_channels:
+            raise ConnectionError("Hub went away")
+        self.commands.append((room_id, channel_id, level))
+
+
+@pytest.fixture
+def set_level():
+    """Patch the rakopy Hub level command."""
+    fake = FakeSetLevel()
+    with patch.object(Hub, "set_level", lambda hub, *args: fake(hub, *args)):
+        yield fake
+
+
+@pytest.fixture
+async def hub_client(hass: HomeAssistant):
+    """Return a Hub client whose fade task only ticks when a test drives it."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_NAME: "test", CONF_HOST: "127.0.0.1"})
+    entry.add_to_hass(hass)
+    client = HubClient(name="test", host="127.0.0.1", entry_id=entry.entry_id, hass=hass)
+    entry.runtime_data = {"hub_id": "hub1", "hub_client": client}
+
+    with patch("custom_components.rako.hub_client.FADE_TICK_INTERVAL", 3600):
+        yield client
+        await client.async_stop()
+
+
+async def test_tick_caps_commands_and_sends_final_levels_first(
+    hass: HomeAssistant, hub_client: HubClient, set_level: FakeSetLevel
+) -> None:
+    """Test a tick sends at most the cap, finished fades first."""
+    long_fades = FADE_MAX_COMMANDS_PER_TICK
+    for channel_id in range(1, long_fades + 1):
+        await hub_client.fade_level(1, channel_id, 0, 255, 100)
+    await hub_client.fade_level(2, 1, 0, 255, 1)
+    await hub_client.fade_level(2, 2, 0, 255, 1)
+
+    await hub_client._async_fade_tick(hass.loop.time() + 10)
+
+    assert len(set_level.commands) == FADE_MAX_COMMANDS_PER_TICK
+    assert set_level.commands[:2] == [(2, 1, 255), (2, 2, 255)]
+    # Finished fades are done, two long fades wait for the next tick
+    assert set(hub_client._fades) == {(1, channel_id) for channel_id in range(1, long_fades + 1)}
+    assert sum(fade.sent_level == 0 for fade in hub_client._fades.values()) == 2
+
+    waiting_channels = {
+        channel_id for (_, channel_id), fade in hub_client._fades.items() if fade.sent_level == 0
+    }
+    set_level.commands.clear()
+    await hub_client._async_fade_tick(hass.loop.time() + 20)
+
+    # The channels that waited longest are stepped first
+    assert {channel_id for _, channel_id, _ in set_level.commands[:2]} == waiting_channels
+    assert len(set_level.commands) == FADE_MAX_COMMANDS_PER_TICK
+
+
+async def test_room_and_channel_commands_override_each_other(
+    hass: HomeAssistant, hub_client: HubClient, set_level: FakeSetLevel
+) -> None:
+    """Test channel 0 cancels every fade in its room and is cancelled by any channel."""
+    await hub_client.fade_level(1, 1, 0, 255, 100)
+    await hub_client.fade_level(1, 2, 0, 255, 100)
+    await hub_client.fade_level(2, 1, 0, 255, 100)
+
+    await hub_client.set_level(1, 0, 128)
+    assert set(hub_client._fades) == {(2, 1)}
+
+    await hub_client.fade_level(2, 0, 0, 255, 100)
+    assert set(hub_client._fades) == {(2, 0)}
+
+    await hub_client.set_level(2, 3, 10)
+    assert hub_client._fades == {}
+
+
+async def test_failed_command_drops_only_its_fade(
+    hass: HomeAssistant, hub_client: HubClient, set_level: FakeSetLevel
+) -> None:
+    """Test an unexpected error drops the failing fade and keeps the others."""
+    set_level.failing_channels.add(1)
+    await hub_client.fade_level(1, 1, 0, 255, 100)
+    await hub_client.fade_level(1, 2, 0, 255, 100)
+
+    await hub_client._async_fade_tick(hass.loop.time() + 50)
+
+    assert set(hub_client._fades) == {(1, 2)}
+    assert len(set_level.commands) == 1
+    assert set_level.commands[0][:2] == (1, 2)
+
+
+async def test_fade_task_survives_failed_command(
+    hass: HomeAssistant, hub_client: HubClient, set_level: FakeSetLevel
+) -> None:
+    """Test the shared task runs every other fade to its target after a failure."""
+    set_level.failing_channels.add(1)
+    with patch("custom_components.rako.hub_client.FADE_TICK_INTERVAL", 0.01):
+        await hub_client.fade_level(1, 1, 0, 255, 0.05)
+        await hub_client.fade_level(1, 2, 0, 255, 0.05)
+        await asyncio.wait_for(hub_client._fade_task, timeout=5)
+
+    assert hub_client._fade_task.exception() is None
+    assert hub_client._fades == {}
+    assert set_level.commands[-1] == (1, 2, 255)
+
+
+async def test_hub_level_change_cancels_fade(
+    hass: HomeAssistant, hub_client: HubClient, set_level: FakeSetLevel
+) -> None:
+    """Test a reported level off the fade's path cancels it, echoes do not."""
+    await hub_client.fade_level(1, 1, 0, 200, 100)
+    await hub_client._async_fade_tick(hass.loop.time() + 50)
+    sent_level = hub_client._fades[(1, 1)].sent_level
+
+    hub_client._cancel_fade_for_level(1, 1, sent_level // 2)
+    hub_client._cancel_fade_for_level(1, 1, 200)
+    assert (1, 1) in hub_client._fades
+
+    hub_client._cancel_fade_for_level(1, 1, 255)
+    assert (1, 1) not in hub_client._fades
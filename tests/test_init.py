@@ -0,0 +1,127 @@
+"""Tests for the Rako integration setup and unload."""
+import asyncio
+import gc
+from types import SimpleNamespace
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+from custom_components.rako.const import DOMAIN
+from custom_components.rako.hub_client import HubClient
+
+RELOADS = 200
+MAX_MEMORY_GROWTH = 2 * 1024 * 1024
+
+
+class FakeHub:
+    """Fake rakopy Hub with one light room and a never ending event stream."""
+
+    def __init__(self) -> None:
+        """Initialize the fake hub."""
+        self.streams_opened = 0
+        self.streams_closed = 0
+
+    async def get_hub_status(self, hub: HubClient) -> SimpleNamespace:
+        """Return the hub status."""
+        return SimpleNamespace(id="hub1", mac_address="00:11:22:33:44:55")
+
+    async def get_rooms(self, hub: HubClient) -> list[SimpleNamespace]:
+        """Return one light room without channels."""
+        return [
+            SimpleNamespace(
+                id=1,
+                title="Lounge",
+                type="LIGHT",
+                channels=[],
+                scenes=[SimpleNamespace(id=0, title="Off"), SimpleNamespace(id=1, title="On")],
+            )
+        ]
+
+    async def get_levels(self, hub: HubClient) -> list[SimpleNamespace]:
+        """Return the levels of the light room."""
+        return [
+            SimpleNamespace(
+                room_id=1,
+                current_scene_id=0,
+                channel_levels=[
+                    SimpleNamespace(channel_id=0, current_level=0, target_level=None)
+                ],
+            )
+        ]
+
+    async def get_events(self, hub: HubClient):
+        """Hold the event connection open until the stream is closed."""
+        self.streams_opened += 1
+        try:
+            while True:
+                await asyncio.sleep(3600)
+                yield None
+        finally:
+            self.streams_closed += 1
+
+
+@pytest.fixture
+def fake_hub():
+    """Patch HubClient to talk to a fake hub."""
+    fake = FakeHub()
+    with (
+        patch.object(HubClient, "get_hub_status", lambda hub: fake.get_hub_status(hub)),
+        patch.object(HubClient, "get_rooms", lambda hub: fake.get_rooms(hub)),
+        patch.object(HubClient, "get_levels", lambda hub: fake.get_levels(hub)),
+        patch.object(HubClient, "get_events", lambda hub: fake.get_events(hub)),
+    ):
+        yield fake
+
+
+def _rako_task_names() -> list[str]:
+    """Return the names of the running Rako background tasks."""
+    return [
+        task.get_name()
+        for task in asyncio.all_tasks()
+        if task.get_name().startswith("rako_")
+        and task.get_name().endswith(("_event_listener_task", "_fade_task"))
+    ]
+
+
+async def test_reload_does_not_leak(hass: HomeAssistant, fake_hub: FakeHub) -> None:
+    """Test repeated reloads leave no tasks, connections or memory behind."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_NAME: "test", CONF_HOST: "127.0.0.1"}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Warm up so caches filled on the first reload are not counted as growth
+    assert await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    task_count = len(asyncio.all_tasks())
+    gc.collect()
+    tracemalloc.start()
+    try:
+        memory_before, _ = tracemalloc.get_traced_memory()
+        for _ in range(RELOADS):
+            assert await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+        gc.collect()
+        memory_after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(asyncio.all_tasks()) == task_count
+    assert _rako_task_names() == ["rako_hub1_event_listener_task"]
+    assert memory_after - memory_before < MAX_MEMORY_GROWTH
+    assert fake_hub.streams_closed == fake_hub.streams_opened - 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert _rako_task_names() == []
+    assert fake_hub.streams_closed == fake_hub.streams_opened == RELOADS + 2